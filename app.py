@@ -1,10 +1,37 @@
 # ─── Imports ───────────────────────────────────────────────────────────────────
-from flask import Flask, render_template, request, jsonify, redirect, flash, url_for
+from flask import Flask, Request, render_template, request, jsonify, redirect, flash, url_for, g, abort, send_from_directory
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
-from datetime import datetime
+import click
+from markupsafe import Markup
+from sqlalchemy import event, inspect
+from datetime import datetime, timedelta
+import bisect
+import hashlib
+import heapq
+import json
+import mimetypes
 import os
+import re
+import secrets
+import shutil
+import tempfile
+import threading
+import time
+import unicodedata
+from urllib.parse import quote
+from werkzeug.datastructures import FileStorage
+from werkzeug.exceptions import ServiceUnavailable
+from werkzeug.security import safe_join
 from werkzeug.utils import secure_filename
+import base64
+import io
+import struct
+
+try:
+    from PIL import Image
+except ImportError:  # placeholders need Pillow; dimensions fall back to header parsing
+    Image = None
 
 
 allowed_extensions = {'png', 'jpg', 'jpeg', 'gif'}
@@ -23,7 +50,273 @@ app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 UPLOAD_FOLDER = os.path.join('static', 'uploads')
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max
+app.config['MAX_FORM_MEMORY_SIZE'] = 512 * 1024  # non-file form fields only
+app.config['UPLOAD_CHUNK_SIZE'] = 64 * 1024
+app.config['UPLOAD_BYTES_BUDGET'] = 48 * 1024 * 1024  # concurrent upload bytes per process
+app.config['UPLOAD_MAX_CONCURRENT'] = 4  # uploads per process; keep below the worker thread count
+app.config['UPLOAD_RETRY_AFTER'] = 5  # seconds
+# Request bodies spool here; not served, but on the same filesystem as
+# UPLOAD_FOLDER so a local save can link the spooled file into place.
+app.config['UPLOAD_SPOOL_FOLDER'] = os.path.join(app.instance_path, 'upload-spool')
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+os.makedirs(app.config['UPLOAD_SPOOL_FOLDER'], exist_ok=True)
+
+# Upload storage: 'local' writes to UPLOAD_FOLDER, 's3' to any S3-compatible
+# bucket (AWS, MinIO, R2...) so several nodes can share uploads.
+app.config['STORAGE_BACKEND'] = os.environ.get('STORAGE_BACKEND', 'local')
+app.config['S3_BUCKET'] = os.environ.get('S3_BUCKET')
+app.config['S3_ENDPOINT_URL'] = os.environ.get('S3_ENDPOINT_URL')  # e.g. http://localhost:9000 for MinIO
+app.config['S3_REGION'] = os.environ.get('S3_REGION')
+app.config['S3_PUBLIC_URL'] = os.environ.get('S3_PUBLIC_URL')  # CDN base URL stored on the models
+app.config['S3_KEY_PREFIX'] = os.environ.get('S3_KEY_PREFIX', 'uploads/')
+app.config['S3_MAX_POOL_CONNECTIONS'] = 10
+app.config['S3_MULTIPART_THRESHOLD'] = 8 * 1024 * 1024
+
+# File serving: 'sendfile' streams from the worker (wsgi.file_wrapper, with
+# Range/If-Range), 'x-sendfile' and 'x-accel-redirect' hand the transfer to a
+# front proxy. For nginx:
+#     location /_files/ { internal; alias /srv/ngc/; }
+app.config['FILE_SERVING'] = os.environ.get('FILE_SERVING', 'sendfile')
+app.config['X_ACCEL_PREFIX'] = '/_files'
+app.config['USE_X_SENDFILE'] = app.config['FILE_SERVING'] == 'x-sendfile'
+app.config['DOCUMENT_FOLDER'] = 'photos'  # certificate PDFs
+app.config['DOCUMENT_EXTENSIONS'] = {'pdf'}
+app.config['UPLOAD_MAX_AGE'] = 365 * 24 * 3600  # upload names are unique per save
+
+
+# ─── Upload Handling ───────────────────────────────────────────────────────────
+class UploadRequest(Request):
+    # Werkzeug keeps small files in memory; always spool file parts to a
+    # temp file in the spool folder so LocalStorage can hard-link it into
+    # UPLOAD_FOLDER instead of writing the bytes a second time.
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.NamedTemporaryFile("wb+", dir=app.config['UPLOAD_SPOOL_FOLDER'], prefix="upload-", suffix=".part")
+
+
+app.request_class = UploadRequest
+
+
+class UploadBudget:
+    """Per-process cap on the multipart uploads in flight, by count and by bytes.
+
+    The count cap keeps many slow, small uploads from holding every worker."""
+
+    def __init__(self, limit, max_uploads):
+        self.limit = limit
+        self.max_uploads = max_uploads
+        self.in_flight = 0
+        self.uploads = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, nbytes):
+        with self._lock:
+            if self.uploads >= self.max_uploads:
+                return False
+            if self.in_flight and self.in_flight + nbytes > self.limit:
+                return False
+            self.in_flight += nbytes
+            self.uploads += 1
+            return True
+
+    def release(self, nbytes):
+        with self._lock:
+            self.in_flight -= nbytes
+            self.uploads -= 1
+
+
+upload_budget = UploadBudget(app.config['UPLOAD_BYTES_BUDGET'], app.config['UPLOAD_MAX_CONCURRENT'])
+
+
+@app.before_request
+def admit_upload():
+    if request.mimetype != 'multipart/form-data':
+        return
+    # Chunked bodies have no length up front; reserve the worst case.
+    nbytes = request.content_length or app.config['MAX_CONTENT_LENGTH']
+    if not upload_budget.acquire(nbytes):
+        raise ServiceUnavailable("Too many uploads in progress, please retry shortly.",
+                                 retry_after=app.config['UPLOAD_RETRY_AFTER'])
+    g.upload_reserved = nbytes
+
+
+@app.teardown_request
+def release_upload(exc=None):
+    nbytes = g.pop('upload_reserved', None)
+    if nbytes:
+        upload_budget.release(nbytes)
+
+
+class LocalStorage:
+    """Stores uploads in UPLOAD_FOLDER, served from /static/uploads."""
+
+    def __init__(self, folder, chunk_size):
+        self.folder = folder
+        self.chunk_size = chunk_size
+
+    def save(self, file, filename):
+        tmp_path = os.path.join(self.folder, f".save-{secrets.token_hex(8)}.part")
+        try:
+            if not self._link_spooled(file.stream, tmp_path):
+                with open(tmp_path, "xb") as out:
+                    file.stream.seek(0)
+                    shutil.copyfileobj(file.stream, out, self.chunk_size)
+                    out.flush()
+                    os.fsync(out.fileno())
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, os.path.join(self.folder, filename))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return f"/static/uploads/{filename}"
+
+    @staticmethod
+    def _link_spooled(stream, path):
+        """Hard-link the request's spool file (see UploadRequest) to path."""
+        spooled = getattr(stream, "name", None)
+        if not isinstance(spooled, str):
+            return False
+        stream.flush()
+        os.fsync(stream.fileno())
+        try:
+            os.link(spooled, path)
+        except OSError:  # another filesystem, or no hard links: copy instead
+            return False
+        return True
+
+
+class S3Storage:
+    """Stores uploads in an S3-compatible bucket; needs boto3."""
+
+    def __init__(self, config):
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+        from botocore.config import Config
+
+        self.bucket = config['S3_BUCKET']
+        self.prefix = config['S3_KEY_PREFIX']
+        # One client per process; botocore pools its HTTP connections.
+        self.client = boto3.client(
+            's3',
+            endpoint_url=config['S3_ENDPOINT_URL'],
+            region_name=config['S3_REGION'],
+            config=Config(max_pool_connections=config['S3_MAX_POOL_CONNECTIONS'],
+                          retries={'mode': 'standard'}),
+        )
+        # Files above the threshold go up as multipart uploads, in parallel parts.
+        self.transfer = TransferConfig(multipart_threshold=config['S3_MULTIPART_THRESHOLD'],
+                                       multipart_chunksize=config['S3_MULTIPART_THRESHOLD'])
+        base = config['S3_PUBLIC_URL'] or f"{self.client.meta.endpoint_url}/{self.bucket}"
+        self.base_url = base.rstrip('/')
+
+    def save(self, file, filename):
+        key = f"{self.prefix}{filename}"
+        file.stream.seek(0)
+        self.client.upload_fileobj(
+            file.stream, self.bucket, key,
+            ExtraArgs={
+                'ContentType': file.mimetype or mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+                'CacheControl': f"public, max-age={app.config['UPLOAD_MAX_AGE']}, immutable",
+            },
+            Config=self.transfer,
+        )
+        return f"{self.base_url}/{key}"
+
+
+def create_storage(config):
+    if config['STORAGE_BACKEND'] == 's3':
+        return S3Storage(config)
+    return LocalStorage(config['UPLOAD_FOLDER'], config['UPLOAD_CHUNK_SIZE'])
+
+
+storage = create_storage(app.config)
+
+
+def save_upload(file, name):
+    """Store an uploaded file under a safe name and return the URL to save on the model."""
+    return storage.save(file, secure_filename(name))
+
+
+# ─── Image Metadata ────────────────────────────────────────────────────────────
+PLACEHOLDER_SIZE = 16  # longest side of the inline LQIP, in pixels
+
+def read_image_size(stream):
+    """Width and height from a PNG, GIF or JPEG header, without decoding."""
+    head = stream.read(26)
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return struct.unpack(">II", head[16:24])
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return struct.unpack("<HH", head[6:10])
+    if head.startswith(b"\xff\xd8"):
+        stream.seek(2)
+        while True:
+            marker, length = struct.unpack(">2sH", stream.read(4))
+            if marker[0] != 0xFF:
+                break
+            if marker[1] in (0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF):
+                height, width = struct.unpack(">xHH", stream.read(5))
+                return width, height
+            stream.seek(length - 2, os.SEEK_CUR)
+    return None, None
+
+def image_metadata(file):
+    """Intrinsic size, dominant colour and a tiny data-URI placeholder of an upload."""
+    meta = {"width": None, "height": None, "color": None, "placeholder": None}
+    stream = file.stream
+    try:
+        stream.seek(0)
+        if Image is None:
+            meta["width"], meta["height"] = read_image_size(stream)
+            return meta
+        with Image.open(stream) as img:
+            meta["width"], meta["height"] = img.size
+            # Decode JPEGs at a reduced scale and shrink before converting, so
+            # a large photo is never held in memory at full resolution.
+            img.draft("RGB", (PLACEHOLDER_SIZE * 8,) * 2)
+            img.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+            img = img.convert("RGB")
+            meta["color"] = "#%02x%02x%02x" % img.resize((1, 1), Image.BOX).getpixel((0, 0))
+            buffer = io.BytesIO()
+            img.save(buffer, "JPEG", quality=40)
+            meta["placeholder"] = "data:image/jpeg;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+    except Exception:
+        app.logger.warning("Could not read image metadata for %s", file.filename, exc_info=True)
+    finally:
+        stream.seek(0)
+    return meta
+
+def set_cover_image(project, file):
+    meta = image_metadata(file)
+    project.cover_image_url = save_upload(file, f"cover_{datetime.now().timestamp()}_{file.filename}")
+    project.cover_width = meta["width"]
+    project.cover_height = meta["height"]
+    project.cover_color = meta["color"]
+    project.cover_placeholder = meta["placeholder"]
+
+def set_section_image(section, file):
+    meta = image_metadata(file)
+    section.image_url = save_upload(file, f"section_{section.id}_{datetime.now().timestamp()}_{file.filename}")
+    section.image_width = meta["width"]
+    section.image_height = meta["height"]
+    section.image_color = meta["color"]
+    section.image_placeholder = meta["placeholder"]
+
+@app.cli.command("backfill-image-metadata")
+def backfill_image_metadata_command():
+    """Fill in size, colour and placeholder for images uploaded before they were recorded."""
+    items = [(p, p.cover_image_url, "cover") for p in
+             Project.query.filter(Project.cover_image_url.isnot(None), Project.cover_width.is_(None))]
+    items += [(s, s.image_url, "image") for s in
+              ProjectSection.query.filter(ProjectSection.image_url.isnot(None), ProjectSection.image_width.is_(None))]
+    for obj, url, prefix in items:
+        path = os.path.join(app.config['UPLOAD_FOLDER'], os.path.basename(url))
+        if not url.startswith("/static/uploads/") or not os.path.isfile(path):
+            continue
+        with open(path, "rb") as f:
+            meta = image_metadata(FileStorage(f, filename=path))
+        for key, value in meta.items():
+            setattr(obj, f"{prefix}_{key}", value)
+    db.session.commit()
 
 # ─── Database Setup ────────────────────────────────────────────────────────────
 db = SQLAlchemy(app)
@@ -52,8 +345,43 @@ class ProjectSection(db.Model):
     layout_type = db.Column(db.String(20))  # 'full-text', 'text-image', 'image-text', 'stats', etc.
     order = db.Column(db.Integer)
     image_url = db.Column(db.String(255)) 
+    image_width = db.Column(db.Integer)
+    image_height = db.Column(db.Integer)
+    image_color = db.Column(db.String(7))
+    image_placeholder = db.Column(db.Text)  # data: URI, under 1 KB
+
+
+
+class ChangeEvent(db.Model):
+    __table_args__ = {'sqlite_autoincrement': True}  # never reuse a sequence number
+    seq = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(30), nullable=False)  # 'project', 'project_section', ...
+    entity_id = db.Column(db.Integer)
+    project_id = db.Column(db.Integer, index=True)
+    op = db.Column(db.String(10), nullable=False)  # 'insert', 'update' or 'delete'
+    payload = db.Column(db.Text)  # JSON: all columns on insert, changed columns on update
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 
+class ChangeFeedCheckpoint(db.Model):
+    consumer = db.Column(db.String(50), primary_key=True)
+    seq = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class CatalogueVersion(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+
+class RelatedProject(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), index=True)
+    related_id = db.Column(db.Integer, db.ForeignKey('project.id', ondelete='CASCADE'))
+    score = db.Column(db.Integer)
+    rank = db.Column(db.Integer)
+    related = db.relationship('Project', foreign_keys=[related_id], lazy='joined')
+
 
 class Project(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -70,8 +398,14 @@ class Project(db.Model):
     feature = db.Column(db.Boolean, default=False)
     featured_description = db.Column(db.Text)
     cover_image_url = db.Column(db.String(255))  # For card thumbnails
+    cover_width = db.Column(db.Integer)
+    cover_height = db.Column(db.Integer)
+    cover_color = db.Column(db.String(7))
+    cover_placeholder = db.Column(db.Text)  # data: URI, under 1 KB
     sections = db.relationship('ProjectSection', backref='project', cascade="all, delete-orphan")
     statistics = db.relationship('ProjectStatistic', backref='project', cascade="all, delete-orphan")
+    related_projects = db.relationship('RelatedProject', foreign_keys=[RelatedProject.project_id],
+                                       order_by=RelatedProject.rank, cascade="all, delete-orphan")
     @property
     def formatted_date(self):
         if self.date:
@@ -92,6 +426,651 @@ def handle_date_input(date_str):
             return None
     return None
 
+def project_list_args(args):
+    """catalogue.query() arguments from the /projects query string."""
+    page = args.get("page", type=int)
+    return {
+        "q": args.get("q"),
+        "service": args.get("service"),
+        "market": args.get("market"),
+        "location": args.get("location"),
+        "sort": args.get("sort", "date_desc"),
+        "page": max(page, 1) if page is not None else None,
+        "per_page": min(max(args.get("per_page", 12, type=int), 1), 100),
+    }
+
+
+# ─── Change Feed ───────────────────────────────────────────────────────────────
+# Every flush that touches a project or its parts queues change_event rows,
+# inserted on the same connection just before the commit so they commit or
+# roll back with the change. The insert holds the feed's write lock until the
+# commit, so seq order is commit order: a reader never sees a seq before a
+# lower one commits, and a gap can only be a rolled-back transaction.
+# Derived data (indexes, caches, other nodes) tails the feed by seq.
+CHANGE_FEED_ENTITIES = {
+    Project: "project",
+    ProjectSection: "project_section",
+    ProjectStatistic: "project_statistic",
+    FeaturedProject: "featured_project",
+}
+CHANGE_FEED_BATCH_SIZE = 100
+CHANGE_FEED_RETENTION = 24 * 3600  # seconds; in-memory readers must sync more often than this
+
+# monotonic time of the last commit in this process that wrote change events
+change_feed_state = {"last_local_commit": 0.0}
+
+def change_payload(obj, op):
+    columns = obj.__table__.columns
+    if op == "delete":
+        return None
+    if op == "insert":
+        values = {c.key: getattr(obj, c.key) for c in columns}
+    else:
+        state = inspect(obj)
+        values = {c.key: getattr(obj, c.key) for c in columns if state.attrs[c.key].history.has_changes()}
+    return json.dumps(values, default=str)
+
+@event.listens_for(db.session, "after_flush")
+def queue_change_events(session, flush_context):
+    rows = session.info.setdefault("change_feed_rows", [])
+    changes = [(obj, "insert") for obj in session.new]
+    changes += [(obj, "update") for obj in session.dirty if session.is_modified(obj, include_collections=False)]
+    changes += [(obj, "delete") for obj in session.deleted]
+    for obj, op in changes:
+        entity = CHANGE_FEED_ENTITIES.get(type(obj))
+        if entity is None:
+            continue
+        rows.append({
+            "entity": entity,
+            "entity_id": obj.id,
+            "project_id": obj.id if isinstance(obj, Project) else obj.project_id,
+            "op": op,
+            "payload": change_payload(obj, op),
+        })
+
+@event.listens_for(db.session, "before_commit")
+def write_change_events(session):
+    session.flush()
+    rows = session.info.pop("change_feed_rows", None)
+    if not rows:
+        return
+    connection = session.connection()
+    # SQLite already allows a single writer per database; Postgres needs the
+    # table lock so concurrent writers take their seqs one commit at a time.
+    if connection.dialect.name == "postgresql":
+        connection.execute(db.text("LOCK TABLE change_event IN SHARE ROW EXCLUSIVE MODE"))
+    created_at = datetime.utcnow()
+    connection.execute(ChangeEvent.__table__.insert(), [dict(row, created_at=created_at) for row in rows])
+    session.info["change_feed_written"] = True
+
+@event.listens_for(db.session, "after_commit")
+def note_local_changes(session):
+    session.info.pop("change_feed_rows", None)
+    if session.info.pop("change_feed_written", False):
+        change_feed_state["last_local_commit"] = time.monotonic()
+
+@event.listens_for(db.session, "after_rollback")
+def discard_local_changes(session):
+    session.info.pop("change_feed_rows", None)
+    session.info.pop("change_feed_written", None)
+
+
+def read_changes(after_seq, limit=CHANGE_FEED_BATCH_SIZE):
+    """Events with seq > after_seq, in commit order."""
+    return ChangeEvent.query.filter(ChangeEvent.seq > after_seq).order_by(ChangeEvent.seq).limit(limit).all()
+
+
+class ChangeFeedConsumer:
+    """Named reader of the change feed that checkpoints its position in the DB."""
+
+    def __init__(self, name, batch_size=CHANGE_FEED_BATCH_SIZE):
+        self.name = name
+        self.batch_size = batch_size
+
+    @property
+    def position(self):
+        checkpoint = db.session.get(ChangeFeedCheckpoint, self.name)
+        return checkpoint.seq if checkpoint else 0
+
+    def checkpoint(self, seq):
+        checkpoint = db.session.get(ChangeFeedCheckpoint, self.name)
+        if checkpoint is None:
+            checkpoint = ChangeFeedCheckpoint(consumer=self.name)
+            db.session.add(checkpoint)
+        checkpoint.seq = seq
+        db.session.commit()
+
+    def poll(self):
+        return read_changes(self.position, self.batch_size)
+
+    def consume(self, handler):
+        """Pass the next batch to handler and checkpoint it; returns the batch size.
+
+        Delivery is at-least-once: if handler fails, the batch is retried."""
+        batch = self.poll()
+        if batch:
+            handler(batch)
+            self.checkpoint(batch[-1].seq)
+        return len(batch)
+
+@app.cli.command("tail-changes")
+@click.argument("consumer")
+@click.option("--follow", is_flag=True, help="Keep polling for new changes.")
+def tail_changes_command(consumer, follow):
+    """Print change events for CONSUMER as JSON lines and checkpoint them."""
+    feed = ChangeFeedConsumer(consumer)
+    def show(batch):
+        for change in batch:
+            click.echo(json.dumps({"seq": change.seq, "entity": change.entity, "entity_id": change.entity_id,
+                                   "project_id": change.project_id, "op": change.op,
+                                   "payload": json.loads(change.payload) if change.payload else None}))
+    while feed.consume(show) or follow:
+        if follow:
+            time.sleep(1)
+
+@app.cli.command("prune-changes")
+def prune_changes_command():
+    """Delete change events past the retention window that every checkpointed consumer has read."""
+    low = db.session.query(db.func.min(ChangeFeedCheckpoint.seq)).scalar()
+    if low:
+        # Readers without a checkpoint (the suggestion index) rely on the
+        # retention window instead; see PrefixIndex.search.
+        cutoff = datetime.utcnow() - timedelta(seconds=CHANGE_FEED_RETENTION)
+        ChangeEvent.query.filter(ChangeEvent.seq <= low, ChangeEvent.created_at < cutoff).delete()
+        db.session.commit()
+
+
+# ─── Search Suggestions ────────────────────────────────────────────────────────
+SUGGEST_FIELDS = ("title", "client", "location", "collaboration")
+SUGGEST_MAX_KEY_LENGTH = 64
+SUGGEST_MAX_ENTRIES = 50000
+SUGGEST_SYNC_INTERVAL = 2  # seconds between change feed checks
+
+_arabic_marks = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]")
+_arabic_letters = str.maketrans({"أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا", "ى": "ي", "ة": "ه", "ؤ": "و", "ئ": "ي"})
+
+def normalize_text(text):
+    """Case-, accent- and diacritic-insensitive form of Latin and Arabic text."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = _arabic_marks.sub("", text).translate(_arabic_letters).casefold()
+    return " ".join(text.split())
+
+
+class PrefixIndex:
+    """Sorted (key, project_id, field, text, depth) tuples searched with bisect.
+
+    depth is 0 for a whole value and i for the suffix starting at word i."""
+
+    def __init__(self):
+        self.entries = None
+        self.seq = 0  # last change_event applied
+        self.synced_at = 0.0
+        self._lock = threading.Lock()
+
+    def _entries_for(self, project):
+        entries = set()
+        for field in SUGGEST_FIELDS:
+            text = (project.get(field) or "").strip()
+            key = normalize_text(text)
+            if not key:
+                continue
+            # Index the whole value and every word suffix, so "cairo"
+            # also finds "New Cairo Towers".
+            words = key.split(" ")
+            for i in range(len(words)):
+                entries.add((" ".join(words[i:])[:SUGGEST_MAX_KEY_LENGTH], project["id"], field, text, i))
+        return entries
+
+    def _cap(self, entries):
+        """Keep at most SUGGEST_MAX_ENTRIES, dropping the deepest word suffixes first."""
+        if len(entries) <= SUGGEST_MAX_ENTRIES:
+            return entries
+        kept = sorted(entries, key=lambda e: (e[4], e[1]))[:SUGGEST_MAX_ENTRIES]
+        app.logger.warning("Suggestion index capped at %d of %d keys, keeping word suffixes up to word %d",
+                           SUGGEST_MAX_ENTRIES, len(entries), kept[-1][4])
+        return sorted(kept)
+
+    def _load(self, project_ids=None):
+        query = db.session.query(Project.id, *(getattr(Project, f) for f in SUGGEST_FIELDS))
+        if project_ids is not None:
+            query = query.filter(Project.id.in_(project_ids))
+        return [row._asdict() for row in query]
+
+    def rebuild(self):
+        # Read the feed position first; replaying a change twice is harmless.
+        self.seq = db.session.query(db.func.max(ChangeEvent.seq)).scalar() or 0
+        entries = set()
+        for project in self._load():
+            entries |= self._entries_for(project)
+        self.entries = self._cap(sorted(entries))
+        self.synced_at = time.monotonic()
+
+    def sync(self):
+        """Apply project changes from the change feed, at most once per interval."""
+        now = time.monotonic()
+        if now - self.synced_at < SUGGEST_SYNC_INTERVAL and change_feed_state["last_local_commit"] < self.synced_at:
+            return
+        self.synced_at = now
+        changes = read_changes(self.seq, limit=1000)
+        if not changes:
+            return
+        self.seq = changes[-1].seq
+        changed_ids = {c.project_id for c in changes if c.entity == "project"}
+        if not changed_ids:
+            return
+        entries = [e for e in self.entries if e[1] not in changed_ids]
+        for project in self._load(changed_ids):
+            for entry in self._entries_for(project):
+                bisect.insort(entries, entry)
+        self.entries = self._cap(entries)
+
+    def search(self, query, limit=10):
+        prefix = normalize_text(query)
+        if not prefix:
+            return []
+        with self._lock:
+            # Past the retention window, changes we haven't read may be pruned.
+            if self.entries is None or time.monotonic() - self.synced_at > CHANGE_FEED_RETENTION:
+                self.rebuild()
+            else:
+                self.sync()
+        entries = self.entries
+        results, seen = [], set()
+        i = bisect.bisect_left(entries, (prefix,))
+        while i < len(entries) and entries[i][0].startswith(prefix) and len(results) < limit:
+            _, project_id, field, text, _ = entries[i]
+            if (field, text) not in seen:
+                seen.add((field, text))
+                results.append({"text": text, "field": field, "project_id": project_id})
+            i += 1
+        return results
+
+
+suggest_index = PrefixIndex()
+
+
+# ─── Related Projects ──────────────────────────────────────────────────────────
+# Each project keeps its top-K neighbours in related_project, scored by shared
+# attribute values. The rows are rewritten in the same transaction as the
+# change, so project_details only reads them.
+RELATED_WEIGHTS = {"market": 3, "service": 2, "client": 2, "location": 1}
+RELATED_TOP_K = 3
+
+@event.listens_for(db.session, "after_flush")
+def track_related_changes(session, flush_context):
+    stale = session.info.setdefault("related_stale", set())
+    for obj in session.new:
+        if isinstance(obj, Project):
+            stale.add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, Project):
+            stale.add(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, Project):
+            state = inspect(obj)
+            if any(state.attrs[f].history.has_changes() for f in RELATED_WEIGHTS):
+                stale.add(obj.id)
+
+def score_related(rows, project_ids):
+    """Top-K neighbours for each of project_ids, using value postings lists."""
+    postings = {}
+    keys = {}
+    for row in rows:
+        keys[row.id] = [(f, normalize_text(getattr(row, f))) for f in RELATED_WEIGHTS if getattr(row, f)]
+        for key in keys[row.id]:
+            postings.setdefault(key, []).append(row.id)
+
+    neighbours = {}
+    for project_id in project_ids:
+        scores = {}
+        for key in keys.get(project_id, ()):
+            weight = RELATED_WEIGHTS[key[0]]
+            for other_id in postings[key]:
+                scores[other_id] = scores.get(other_id, 0) + weight
+        scores.pop(project_id, None)
+        neighbours[project_id] = heapq.nlargest(RELATED_TOP_K, scores.items(), key=lambda item: (item[1], item[0]))
+    return neighbours
+
+def refresh_related(session, stale_ids=None):
+    """Rewrite related_project rows for stale_ids and every project they can affect."""
+    rows = session.query(Project.id, *(getattr(Project, f) for f in RELATED_WEIGHTS)).all()
+    if stale_ids is None:
+        affected = {row.id for row in rows}
+    else:
+        # A change can only reorder the lists of projects that share one of
+        # its new values or that listed it before the change.
+        by_id = {row.id: row for row in rows}
+        values = {(f, normalize_text(getattr(by_id[i], f))) for i in stale_ids if i in by_id
+                  for f in RELATED_WEIGHTS if getattr(by_id[i], f)}
+        affected = {row.id for row in rows
+                    if any((f, normalize_text(getattr(row, f))) in values for f in RELATED_WEIGHTS if getattr(row, f))}
+        affected |= {pid for (pid,) in session.query(RelatedProject.project_id)
+                     .filter(RelatedProject.related_id.in_(stale_ids))}
+        affected |= set(stale_ids)
+
+    neighbours = score_related(rows, affected & {row.id for row in rows})
+    session.query(RelatedProject).filter(
+        RelatedProject.project_id.in_(affected) | RelatedProject.related_id.in_(affected - set(neighbours))
+    ).delete(synchronize_session=False)
+    session.add_all([
+        RelatedProject(project_id=project_id, related_id=related_id, score=score, rank=rank)
+        for project_id, ranked in neighbours.items()
+        for rank, (related_id, score) in enumerate(ranked)
+    ])
+
+@event.listens_for(db.session, "before_commit")
+def update_related_projects(session):
+    session.flush()
+    stale = session.info.pop("related_stale", None)
+    if stale:
+        refresh_related(session, stale)
+
+@event.listens_for(db.session, "after_rollback")
+def discard_related_changes(session):
+    session.info.pop("related_stale", None)
+
+@app.cli.command("rebuild-related")
+def rebuild_related_command():
+    """Recompute related projects for the whole catalogue."""
+    refresh_related(db.session)
+    db.session.commit()
+
+
+# ─── Catalogue Snapshot ────────────────────────────────────────────────────────
+# List pages read a per-worker snapshot of the card fields instead of loading
+# Project objects. Every commit touching the catalogue bumps the single
+# catalogue_version row, which each request compares against (one PK lookup).
+CARD_FIELDS = (
+    "id", "title", "service", "market", "location", "client", "collaboration", "date",
+    "feature", "featured_description", "cover_image_url", "cover_width", "cover_height",
+    "cover_color", "cover_placeholder",
+)
+FILTER_FIELDS = ("title", "service", "market", "location", "client", "collaboration")
+CATALOGUE_MODELS = (Project, ProjectStatistic, FeaturedProject)
+
+
+class ProjectCard:
+    __slots__ = CARD_FIELDS + ("statistics", "keys")
+
+    def __init__(self, row, statistics=()):
+        for field, value in zip(CARD_FIELDS, row):
+            setattr(self, field, value)
+        self.statistics = statistics
+        # Normalized text of the filterable fields, computed once per snapshot.
+        self.keys = {f: normalize_text(getattr(self, f)) for f in FILTER_FIELDS}
+
+    @property
+    def formatted_date(self):
+        if self.date:
+            return self.date.strftime("%d-%m-%Y")  # DD-MM-YYYY
+        return None
+
+
+def card_date_key(card):
+    # Matches ORDER BY date DESC on SQLite: undated projects last.
+    return (card.date is not None, card.date)
+
+class CatalogueSnapshot:
+    def __init__(self):
+        self._state = (None, ())  # (version, cards ordered newest first)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _load(session, version):
+        statistics = {}
+        for stat in session.query(ProjectStatistic.project_id, ProjectStatistic.title,
+                                  ProjectStatistic.value, ProjectStatistic.unit).order_by(ProjectStatistic.order):
+            statistics.setdefault(stat.project_id, []).append(stat)
+        rows = session.query(*(getattr(Project, f) for f in CARD_FIELDS)).all()
+        cards = [ProjectCard(row, tuple(statistics.get(row.id, ()))) for row in rows]
+        cards.sort(key=card_date_key, reverse=True)
+        return version, tuple(cards)
+
+    def cards(self):
+        version = db.session.query(CatalogueVersion.version).filter_by(id=1).scalar() or 0
+        state = self._state
+        if state[0] != version:
+            with self._lock:
+                if self._state[0] != version:
+                    self._state = self._load(db.session, version)
+                state = self._state
+        return state[1]
+
+    async def cards_async(self, session):
+        """cards() for an AsyncSession (see asgi.py)."""
+        result = await session.execute(db.select(CatalogueVersion.version).filter_by(id=1))
+        version = result.scalar() or 0
+        if self._state[0] != version:
+            # No lock: a concurrent reload on the event loop just loads twice.
+            self._state = await session.run_sync(self._load, version)
+        return self._state[1]
+
+    def query(self, q=None, service=None, market=None, location=None, featured=None,
+              sort="date_desc", page=None, per_page=12, cards=None):
+        """Filter, sort and paginate the cards; returns (cards, total)."""
+        if cards is None:
+            cards = self.cards()
+        if featured is not None:
+            cards = [c for c in cards if bool(c.feature) == featured]
+        for field, value in (("service", service), ("market", market), ("location", location)):
+            if value and value != "all":
+                value = normalize_text(value)
+                cards = [c for c in cards if value in c.keys[field]]
+        if q:
+            q = normalize_text(q)
+            cards = [c for c in cards if any(q in c.keys[f] for f in SUGGEST_FIELDS)]
+        if sort == "date_asc":
+            cards = sorted(cards, key=card_date_key)
+        elif sort == "id":
+            cards = sorted(cards, key=lambda c: c.id)
+        total = len(cards)
+        if page:
+            cards = cards[(page - 1) * per_page:page * per_page]
+        return list(cards), total
+
+
+catalogue = CatalogueSnapshot()
+
+@event.listens_for(db.session, "after_flush")
+def track_catalogue_changes(session, flush_context):
+    if any(isinstance(obj, CATALOGUE_MODELS) for obj in list(session.new) + list(session.dirty) + list(session.deleted)):
+        session.info["catalogue_changed"] = True
+
+@event.listens_for(db.session, "before_commit")
+def bump_catalogue_version(session):
+    session.flush()
+    if session.info.pop("catalogue_changed", False):
+        # The id=1 row is created by its migration.
+        session.query(CatalogueVersion).filter_by(id=1).update(
+            {CatalogueVersion.version: CatalogueVersion.version + 1}, synchronize_session=False)
+
+@event.listens_for(db.session, "after_rollback")
+def discard_catalogue_changes(session):
+    session.info.pop("catalogue_changed", None)
+
+
+# ─── CSS Bundling ──────────────────────────────────────────────────────────────
+# `flask build-css` concatenates and minifies the stylesheets each template
+# passes to stylesheets() into one hashed file, and extracts the rules for
+# above-the-fold elements so they can be inlined. Without a build the
+# templates fall back to the individual <link> tags.
+CSS_BUNDLE_FOLDER = os.path.join(app.static_folder, 'css', 'dist')
+CSS_MANIFEST = os.path.join(CSS_BUNDLE_FOLDER, 'manifest.json')
+CRITICAL_SELECTORS = (
+    ":root", "*", "html", "body", ".header", ".navbar", ".logo", ".pages",
+    ".herosec", ".hero-content", ".hero-buttons", ".cover-section", ".cover-text",
+)
+
+_css_strings = r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\''
+_css_tokens = re.compile(rf'({_css_strings})|(/\*.*?\*/)|(\s+)', re.S)
+_css_urls = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+_css_imports = re.compile(r'@import[^;]+;')
+_stylesheets_call = re.compile(r'stylesheets\(([^)]*)\)')
+
+def minify_css(css):
+    def replace(match):
+        if match.group(1):
+            return match.group(1)
+        return "" if match.group(2) else " "
+    parts = re.split(f'({_css_strings})', _css_tokens.sub(replace, css))
+    # Odd parts are string literals and are kept verbatim.
+    parts[::2] = [re.sub(r' ?([{};,>]) ?', r'\1', part) for part in parts[::2]]
+    return "".join(parts).replace(";}", "}").strip()
+
+def rebase_css_urls(css, source, base=CSS_BUNDLE_FOLDER):
+    """Make relative url()s in css from source relative to base, or root-relative if base is None."""
+    def replace(match):
+        url = match.group(2)
+        if url.startswith(("data:", "http:", "https:", "/", "#", "file:")):
+            return match.group(0)
+        target = os.path.normpath(os.path.join(os.path.dirname(source), url))
+        if base is None:
+            return f"url('{app.static_url_path}/{os.path.relpath(target, app.static_folder).replace(os.sep, '/')}')"
+        return f"url('{os.path.relpath(target, base).replace(os.sep, '/')}')"
+    return _css_urls.sub(replace, css)
+
+def split_css_blocks(css):
+    """Yield (prelude, body) for each top-level block of minified css."""
+    depth, start, prelude = 0, 0, None
+    for i, ch in enumerate(css):
+        if ch == "{":
+            if depth == 0:
+                prelude, start = css[start:i].strip(), i + 1
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                yield prelude, css[start:i]
+                start = i + 1
+
+def critical_css(css):
+    rules = []
+    for prelude, body in split_css_blocks(css):
+        if prelude.startswith("@media"):
+            inner = critical_css(body)
+            if inner:
+                rules.append(f"{prelude}{{{inner}}}")
+        elif not prelude.startswith("@") and any(
+            sel.strip().split(" ")[0].split(":")[0].startswith(CRITICAL_SELECTORS) or sel.strip() in CRITICAL_SELECTORS
+            for sel in prelude.split(",")
+        ):
+            rules.append(f"{prelude}{{{body}}}")
+    return "".join(rules)
+
+def build_css_bundle(files):
+    parts = []
+    for filename in files:
+        source = os.path.join(app.static_folder, filename)
+        with open(source, encoding='utf-8') as f:
+            parts.append(rebase_css_urls(minify_css(f.read()), source))
+    css = "".join(parts)
+    # @import is only valid before every other rule.
+    imports = _css_imports.findall(css)
+    css = "".join(imports) + _css_imports.sub("", css)
+    digest = hashlib.sha1(css.encode('utf-8')).hexdigest()[:10]
+    path = os.path.join(CSS_BUNDLE_FOLDER, f"bundle.{digest}.css")
+    with open(path, "w", encoding='utf-8') as f:
+        f.write(css)
+    # The critical rules are inlined into pages at any URL, so their url()s
+    # can't stay relative to the bundle.
+    return {"href": f"css/dist/bundle.{digest}.css", "critical": rebase_css_urls(critical_css(css), path, None)}
+
+@app.cli.command("build-css")
+def build_css_command():
+    """Bundle, minify and extract critical CSS for every template."""
+    os.makedirs(CSS_BUNDLE_FOLDER, exist_ok=True)
+    manifest = {}
+    template_folder = os.path.join(app.root_path, app.template_folder)
+    for name in sorted(os.listdir(template_folder)):
+        with open(os.path.join(template_folder, name), encoding='utf-8') as f:
+            for call in _stylesheets_call.findall(f.read()):
+                files = re.findall(r'[\'"]([^\'"]+)[\'"]', call)
+                key = "|".join(files)
+                if key not in manifest:
+                    manifest[key] = build_css_bundle(files)
+                    click.echo(f"{name}: {len(files)} stylesheets -> {manifest[key]['href']}")
+    with open(CSS_MANIFEST, "w", encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+_css_manifest = {"mtime": None, "bundles": {}}
+
+def css_manifest():
+    try:
+        mtime = os.path.getmtime(CSS_MANIFEST)
+    except OSError:
+        return {}
+    if mtime != _css_manifest["mtime"]:
+        with open(CSS_MANIFEST, encoding='utf-8') as f:
+            _css_manifest["bundles"] = json.load(f)
+        _css_manifest["mtime"] = mtime
+    return _css_manifest["bundles"]
+
+def add_preload(url, kind):
+    g.setdefault("preload_links", []).append(f"<{url}>; rel=preload; as={kind}")
+
+@app.template_global()
+def stylesheets(*files):
+    bundle = css_manifest().get("|".join(files))
+    if not bundle:
+        return Markup("\n").join(
+            Markup('<link rel="stylesheet" href="{}">').format(url_for('static', filename=f)) for f in files
+        )
+    href = url_for('static', filename=bundle["href"])
+    add_preload(href, "style")
+    return Markup(
+        '<style>{critical}</style>\n'
+        '<link rel="preload" href="{href}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">\n'
+        '<noscript><link rel="stylesheet" href="{href}"></noscript>'
+    ).format(critical=Markup(bundle["critical"].replace("</", "<\\/")), href=href)
+
+@app.template_global()
+def preload_image(filename):
+    href = url_for('static', filename=filename)
+    add_preload(href, "image")
+    return Markup('<link rel="preload" href="{}" as="image">').format(href)
+
+# Link headers seen for each endpoint, replayed as 103 Early Hints on later
+# requests when the WSGI server exposes a way to send them.
+early_hints = {}
+
+@app.before_request
+def send_early_hints():
+    send = request.environ.get('wsgi.early_hints')
+    links = early_hints.get(request.endpoint)
+    if send and links:
+        send([("Link", link) for link in links])
+
+@app.after_request
+def add_preload_headers(response):
+    links = g.get("preload_links")
+    if links and response.mimetype == "text/html":
+        response.headers.add("Link", ", ".join(links))
+        early_hints[request.endpoint] = links
+    return response
+
+
+# ─── File Serving ──────────────────────────────────────────────────────────────
+def serve_file(folder, filename, max_age=None):
+    # Relative folders are relative to the app, as send_from_directory has them.
+    folder = os.path.join(app.root_path, folder)
+    if app.config['FILE_SERVING'] != 'x-accel-redirect':
+        return send_from_directory(folder, filename, max_age=max_age)
+
+    path = safe_join(folder, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+    response = app.response_class(mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+    # nginx serves the body, including Range and conditional requests.
+    location = os.path.relpath(path, app.root_path).replace(os.sep, '/')
+    response.headers['X-Accel-Redirect'] = quote(f"{app.config['X_ACCEL_PREFIX']}/{location}")
+    if max_age:
+        # X-Accel-Expires only drives nginx's cache; browsers need Cache-Control.
+        response.headers['X-Accel-Expires'] = str(max_age)
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+    return response
+
 
 # ─── Routes ───────────────────────────────────────────────────────────────────
 
@@ -99,10 +1078,7 @@ def handle_date_input(date_str):
 @app.route("/")
 def home():
        # Get featured projects
-    featured_projects = Project.query.filter_by(feature=True).all()
-
-
-    
+    featured_projects, _ = catalogue.query(featured=True, sort="id")
     return render_template("index.html", projects=featured_projects)
 
 
@@ -125,9 +1101,11 @@ def certification():
 @app.route("/projects")
 
 def show_projects():
-        # Order by date descending (newest first)
-    all_projects = Project.query.order_by(Project.date.desc()).all()
-    return render_template("projects.html", projects=all_projects)
+        # Order by date descending (newest first); filtering also works client-side
+    args = project_list_args(request.args)
+    all_projects, total = catalogue.query(**args)
+    return render_template("projects.html", projects=all_projects, total=total,
+                           page=args["page"], per_page=args["per_page"])
 
 @app.route("/projects/<int:project_id>")
 def project_details(project_id):
@@ -139,6 +1117,23 @@ def featured_projects():
     featured = FeaturedProject.query.join(Project).order_by(Project.date.desc()).all()
     return render_template("admin_featured.html", featured_projects=featured)
 
+@app.route("/static/uploads/<path:filename>")
+def uploaded_file(filename):
+    return serve_file(app.config['UPLOAD_FOLDER'], filename, max_age=app.config['UPLOAD_MAX_AGE'])
+
+@app.route("/documents/<path:filename>")
+def document(filename):
+    if filename.rsplit('.', 1)[-1].lower() not in app.config['DOCUMENT_EXTENSIONS']:
+        abort(404)
+    return serve_file(app.config['DOCUMENT_FOLDER'], filename)
+
+# ─── API ───────────────────────────────────────────────────────────────────────
+@app.route("/api/suggest")
+def suggest():
+    query = request.args.get("q", "")
+    limit = min(request.args.get("limit", 10, type=int), 25)
+    return jsonify({"query": query, "suggestions": suggest_index.search(query, limit)})
+
 # ─── Admin Routes ──────────────────────────────────────────────────────────────
 @app.route("/admin/home")
 def admin_home():
@@ -160,7 +1155,8 @@ def feature_project(id):
                 db.session.add(FeaturedProject(project_id=id))
         elif action == 'unfeature':
             project.feature = False
-            FeaturedProject.query.filter_by(project_id=id).delete()
+            for entry in FeaturedProject.query.filter_by(project_id=id):
+                db.session.delete(entry)
         else:
             return jsonify({"status": "error", "message": "Invalid action"}), 400
         
@@ -216,7 +1212,7 @@ def admin_projects():
         return "✅ Project added successfully!"
 
        # Order by date descending (newest first)
-    projects = Project.query.order_by(Project.date.desc()).all()
+    projects, _ = catalogue.query()
     return render_template("admin_projects.html", projects=projects)
 
 
@@ -249,26 +1245,22 @@ def add_project():
             flash("Invalid completion date format", "error")
             return redirect("/admin/projects/new")
 
-        # Handle file upload
-        cover_file = request.files.get("cover_image")
-        cover_path = None
-        if cover_file and cover_file.filename:
-            if not allowed_file(cover_file.filename):
-                flash('Invalid file type - only images allowed')
-                return redirect(request.url)
-            
-            filename = secure_filename(f"cover_{datetime.now().timestamp()}_{cover_file.filename}")            
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            cover_file.save(filepath)
-            cover_path = f"/static/uploads/{filename}"
         # Create project
         project = Project(
             **form_data,
             date=date,
             completion_date=completion_date,
-            cover_image_url=cover_path,
             feature=feature
         )
+
+        # Handle file upload
+        cover_file = request.files.get("cover_image")
+        if cover_file and cover_file.filename:
+            if not allowed_file(cover_file.filename):
+                flash('Invalid file type - only images allowed')
+                return redirect(request.url)
+            
+            set_cover_image(project, cover_file)
         
         db.session.add(project)
         db.session.commit()
@@ -324,10 +1316,7 @@ def edit_project_full(id):
             flash('Invalid file type - only images allowed')
             return redirect(request.url)
             
-        filename = secure_filename(f"cover_{datetime.now().timestamp()}_{cover_file.filename}")            
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        cover_file.save(filepath)
-        project.cover_image_url = f"/static/uploads/{filename}"
+        set_cover_image(project, cover_file)
 
     # Handle feature status 
     feature_value = request.form.get('feature')
@@ -362,7 +1351,8 @@ def edit_project_full(id):
             ))
     
     # Replace all statistics
-    ProjectStatistic.query.filter_by(project_id=project.id).delete()
+    for stat in ProjectStatistic.query.filter_by(project_id=project.id):
+        db.session.delete(stat)
     db.session.add_all(new_stats)
 
     # Handle sections (update in-place, create new, delete removed)
@@ -395,12 +1385,7 @@ def edit_project_full(id):
                 img_file = request.files.get(file_key)
 
                 if img_file and img_file.filename and allowed_file(img_file.filename):
-                    filename = secure_filename(
-                        f"section_{section.id}_{datetime.now().timestamp()}_{img_file.filename}"
-                    )
-                    filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                    img_file.save(filepath)
-                    section.image_url = f"/static/uploads/{filename}"
+                    set_section_image(section, img_file)
 
 
 
@@ -432,16 +1417,14 @@ def edit_project_full(id):
         if idx < len(new_images):
             img_file = new_images[idx]
             if img_file and img_file.filename and allowed_file(img_file.filename):
-                filename = secure_filename(f"section_{section.id}_{datetime.now().timestamp()}_{img_file.filename}")
-                filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                img_file.save(filepath)
-                section.image_url = f"/static/uploads/{filename}"
+                set_section_image(section, img_file)
 
 # Only delete sections explicitly removed in the form
             form_section_ids = {int(sid) for sid in section_ids if sid.strip().isdigit()}
             to_delete = {s.id for s in project.sections} - form_section_ids
             if to_delete:
-                ProjectSection.query.filter(ProjectSection.id.in_(to_delete)).delete(synchronize_session=False)
+                for removed in ProjectSection.query.filter(ProjectSection.id.in_(to_delete)):
+                    db.session.delete(removed)
 
     
     db.session.commit()
@@ -0,0 +1,163 @@
+# ─── ASGI Entry Point ──────────────────────────────────────────────────────────
+# Run with:  uvicorn asgi:application
+#
+# The public read pages (home, project list, project details) run as
+# coroutines on an async SQLAlchemy engine, so a slow client or a DB wait
+# holds no worker thread. Every other route, admin included, is the unchanged
+# Flask app behind a2wsgi, on its own thread pool, with request bodies
+# streamed to Flask as they arrive.
+import asyncio
+import io
+import os
+import re
+import sys
+from urllib.parse import parse_qsl
+
+from a2wsgi import WSGIMiddleware
+from flask import g, render_template
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload
+from werkzeug.datastructures import MultiDict
+
+from app import app, db, catalogue, project_list_args, Project, RelatedProject
+
+
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+app.config['ASYNC_DATABASE_URI'] = os.environ.get('ASYNC_DATABASE_URI')
+app.config['ASYNC_POOL_SIZE'] = 10
+app.config['ASYNC_MAX_OVERFLOW'] = 10
+app.config['WSGI_WORKERS'] = 16  # threads for the routes served by Flask
+
+
+def async_database_url():
+    if app.config['ASYNC_DATABASE_URI']:
+        return app.config['ASYNC_DATABASE_URI']
+    with app.app_context():
+        url = db.engine.url  # resolved by Flask-SQLAlchemy (instance folder for SQLite)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+
+
+engine = create_async_engine(async_database_url(), pool_size=app.config['ASYNC_POOL_SIZE'],
+                             max_overflow=app.config['ASYNC_MAX_OVERFLOW'])
+Session = async_sessionmaker(engine, expire_on_commit=False)
+# One DB-backed render per pool connection; the rest wait here as cheap
+# coroutines instead of timing out on the pool.
+inflight = asyncio.Semaphore(app.config['ASYNC_POOL_SIZE'] + app.config['ASYNC_MAX_OVERFLOW'])
+wsgi = WSGIMiddleware(app, workers=app.config['WSGI_WORKERS'])
+
+
+# ─── Async Views ───────────────────────────────────────────────────────────────
+# Each returns (template, context), or None to let Flask answer instead.
+async def home(session, args):
+    cards = await catalogue.cards_async(session)
+    featured_projects, _ = catalogue.query(featured=True, sort="id", cards=cards)
+    return "index.html", {"projects": featured_projects}
+
+async def show_projects(session, args):
+    cards = await catalogue.cards_async(session)
+    list_args = project_list_args(args)
+    all_projects, total = catalogue.query(**list_args, cards=cards)
+    return "projects.html", {"projects": all_projects, "total": total,
+                             "page": list_args["page"], "per_page": list_args["per_page"]}
+
+async def project_details(session, args, project_id):
+    # Load everything projects-sub.html touches up front; lazy loads can't
+    # run outside the session.
+    result = await session.execute(
+        db.select(Project).where(Project.id == int(project_id)).options(
+            selectinload(Project.sections),
+            selectinload(Project.statistics),
+            selectinload(Project.related_projects).joinedload(RelatedProject.related),
+        )
+    )
+    project = result.scalar_one_or_none()
+    if project is None:
+        return None  # Flask renders the 404
+    return "projects-sub.html", {"project": project}
+
+ROUTES = [
+    (re.compile(r"/"), home),
+    (re.compile(r"/projects"), show_projects),
+    (re.compile(r"/projects/(\d+)"), project_details),
+]
+
+
+# ─── Application ───────────────────────────────────────────────────────────────
+def request_environ(scope):
+    """Minimal WSGI environ for a bodiless request, enough for url_for()."""
+    server_name, server_port = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin1"),
+        "QUERY_STRING": scope["query_string"].decode("latin1"),
+        "SERVER_NAME": server_name,
+        "SERVER_PORT": str(server_port),
+        "SERVER_PROTOCOL": f"HTTP/{scope['http_version']}",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": False,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope["headers"]:
+        name = name.decode("latin1").lower()
+        if name in ("content-type", "content-length"):
+            key = name.upper().replace("-", "_")
+        else:
+            key = "HTTP_" + name.upper().replace("-", "_")
+        value = value.decode("latin1")
+        if key in environ:
+            # HTTP/2 splits Cookie into one header per crumb.
+            value = environ[key] + ("; " if name == "cookie" else ",") + value
+        environ[key] = value
+    return environ
+
+def render_page(scope, template, context):
+    environ = request_environ(scope)
+    with app.request_context(environ):
+        html = render_template(template, **context)
+        links = g.get("preload_links")
+    body = html.encode("utf-8")
+    headers = [
+        (b"content-type", b"text/html; charset=utf-8"),
+        (b"content-length", str(len(body)).encode("latin1")),
+    ]
+    if links:
+        headers.append((b"link", ", ".join(links).encode("latin1")))
+    return headers, body
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await engine.dispose()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await lifespan(receive, send)
+
+    if scope["type"] == "http" and scope["method"] in ("GET", "HEAD"):
+        for pattern, view in ROUTES:
+            match = pattern.fullmatch(scope["path"])
+            if not match:
+                continue
+            args = MultiDict(parse_qsl(scope["query_string"].decode("latin1"), keep_blank_values=True))
+            async with inflight:
+                async with Session() as session:
+                    page = await view(session, args, *match.groups())
+            if page is None:
+                break
+            headers, body = render_page(scope, *page)
+            await send({"type": "http.response.start", "status": 200, "headers": headers})
+            await send({"type": "http.response.body", "body": b"" if scope["method"] == "HEAD" else body})
+            return
+
+    await wsgi(scope, receive, send)
@@ -0,0 +1,66 @@
+import asyncio
+import time
+
+from app import app, upload_budget
+from asgi import application
+
+
+SLOW_SECONDS = 0.3
+
+
+def slow_view():
+    time.sleep(SLOW_SECONDS)
+    return "done"
+
+app.add_url_rule("/_test/slow", "test_slow", slow_view)
+
+
+async def call(method, path, headers=(), body_chunks=(b"",), complete=True):
+    """Run one request through the ASGI app; returns (status, body).
+
+    With complete=False the client stalls after sending body_chunks."""
+    chunks = list(body_chunks)
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": b"", "headers": list(headers),
+        "server": ("testserver", 80), "client": ("127.0.0.1", 1234),
+    }
+    response = {"status": None, "body": b""}
+
+    async def receive():
+        if chunks:
+            chunk = chunks.pop(0)
+            return {"type": "http.request", "body": chunk, "more_body": bool(chunks) or not complete}
+        await asyncio.Event().wait()  # the client never sends the rest
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+
+    await application(scope, receive, send)
+    return response["status"], response["body"]
+
+
+def test_wsgi_routes_run_concurrently():
+    async def run():
+        start = time.monotonic()
+        results = await asyncio.gather(*(call("GET", "/_test/slow") for _ in range(6)))
+        return results, time.monotonic() - start
+
+    results, elapsed = asyncio.run(run())
+    assert [status for status, _ in results] == [200] * 6
+    assert elapsed < SLOW_SECONDS * 3  # one shared thread would take 6x
+
+
+def test_upload_rejected_before_body_arrives():
+    headers = [(b"content-type", b"multipart/form-data; boundary=x"), (b"content-length", b"16000000")]
+    upload_budget.uploads = upload_budget.max_uploads
+    try:
+        status, _ = asyncio.run(asyncio.wait_for(
+            call("POST", "/admin/projects/new", headers, body_chunks=[b"--x\r\n"], complete=False), timeout=5))
+    finally:
+        upload_budget.uploads = 0
+    assert status == 503